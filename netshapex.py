@@ -35,13 +35,47 @@
 # pip install fiona         
 # pip install networkx
 # pip install shapely
+#
+# Optional, for a faster columnar read in io.read (needs shapely 2.x)
+# pip install pyogrio pyarrow
+# pip install numba     (compiled node ids for linestring layers read with pyogrio)
 # =========================== DEPENDENCIES / REQUIREMENTS ======================
 
 
+import concurrent.futures
+import itertools
+import logging
+import os
+import re
+import warnings
+
 import fiona
 from fiona.crs import from_epsg
+from fiona.transform import transform_geom
 import networkx as nx
-from shapely.geometry import Point, mapping, LineString
+from shapely.geometry import mapping
+
+# fiona 1.9 transforms a list of geometries in one transform_geom call and has include_fields in open.
+_FIONA_1_9 = tuple(map(int, re.match(r'(\d+)\.(\d+)', fiona.__version__).groups())) >= (1, 9)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    from pyogrio.raw import read_arrow
+    from shapely import from_wkb, get_coordinates, get_type_id, has_z
+except ImportError:
+    read_arrow = None
+
+try:
+    from numba import njit, types
+    from numba.typed import Dict
+except ImportError:
+    njit = None
 
 class io():
     """"
@@ -50,24 +84,39 @@ class io():
 
     """
 
-    def read(path):
+    def read(path, read_properties=True):
         """
         Reads a single shapefile (ESRI) of type point and or linestring. 
-        The keys are the string of their geometry coordinates.
+        The keys are integers (0, 1, 2, ...), one for each distinct coordinate, in the order the
+        coordinates are first met in the layer. For a linestring, the edge connects the first and
+        the last vertex of the line.
+
+        Each edge (linestring) or node (point) keeps the coordinates of its feature in the 'coords'
+        attribute and the attribute table values in the 'properties' attribute.
+
+        If pyogrio is installed the layer is read in columns through Arrow, otherwise
+        it is read feature by feature with fiona. Both give the same graph.
+
+        Multi-part features (e.i. a MultiLineString in a linestring layer) have no single first and
+        last vertex, a ValueError naming the feature is raised for them.
 
         PARAMETER(S):
 
         : path : path to the .shp file. (e.i. C:\\path\to\line_street.shp)
 
+        : read_properties : If False, the attribute table (.dbf) is not read and 'properties' is empty.
+            Use it when only the geometry of the network is needed. Default is True.
+            False needs pyogrio or fiona 1.9 or newer, with an older fiona a ValueError is raised.
+
         RETURN(S):
 
         : G : Networkx Graph()
 
         : nodes_fixed_positions : Position of each node in Decimal Degree based of the geometry attribute
-            of the features in the layer being read. It is essential to preserve the location of points.
+            of the features in the layer being read, keyed by the node id. It is essential to preserve
+            the location of points.
             (e.i. 
-                (120.90432974785224, 14.391880515315119) for nodes
-                (120.90432974785224, 14.391880515315119)', '(120.90420818465601, 14.392083151914841) for edges
+                {0: (120.90432974785224, 14.391880515315119), 1: (120.90420818465601, 14.392083151914841)}
             )
 
         EXAMPLE:
@@ -94,42 +143,49 @@ class io():
 
         path = path
 
-        with fiona.open(path) as shpfile:
+        if read_arrow is not None:
 
-            if (shpfile[0]['geometry']['type']) == "LineString":
+            geom_type, coordinates, endpoints, properties = _read_arrow_features(path, read_properties)
 
-                nodes_fixed_postions = {}
+            # Node ids of 2D linestrings assigned in compiled code when numba is installed.
+            if geom_type == "LineString" and _assign_ids is not None and endpoints.shape[2] == 2:
 
-                count = 0
+                nodes_fixed_postions = _add_lines_compiled(G, endpoints, coordinates, properties)
 
-                for s in shpfile:
+                return G, nodes_fixed_postions
 
-                    nodeid = str(list(s['geometry']['coordinates'])[0])
+            # One builder picked for the layer, see _GRAPH_BUILDERS.
+            build_graph = _GRAPH_BUILDERS.get(geom_type)
 
-                    nodes_fixed_postions[nodeid] = list(s['geometry']['coordinates'])[0]
-                    id_for_edge_1 = nodeid
+            if build_graph is None:
+                return
 
-                    nodeid = str(list(s['geometry']['coordinates'])[1])
+            nodes_fixed_postions = build_graph(G, zip(coordinates, properties))
 
-                    nodes_fixed_postions[nodeid] = list(s['geometry']['coordinates'])[1]
-                    id_for_edge_2 = nodeid
+            return G, nodes_fixed_postions
 
-                    G.add_edge(id_for_edge_1, id_for_edge_2, geom=s)
+        if not read_properties and not _FIONA_1_9:
+            raise ValueError("read_properties=False needs fiona 1.9 or newer (or pyogrio), found fiona %s."
+                             % fiona.__version__)
 
-                return G, nodes_fixed_postions
+        # Only open with include_fields when fields are skipped, older fiona does not have it.
+        open_options = {} if read_properties else {'include_fields': ()}
+
+        with fiona.open(path, mode='r', **open_options) as shpfile:
 
-            if (shpfile[0]['geometry']['type']) == "Point":
+            # The geometry type comes from the layer schema, no feature is read for it.
+            geom_type = shpfile.schema['geometry'].replace('3D ', '')
 
-                nodes_fixed_postions = {}
+            build_graph = _GRAPH_BUILDERS.get(geom_type)
 
-                for s in shpfile:
+            if build_graph is None:
+                return
 
-                    nodeid = str(s['geometry']['coordinates'])
-                    nodes_fixed_postions[nodeid] = s['geometry']['coordinates']
+            features = _fiona_features(path, shpfile, geom_type)
 
-                    G.add_node(nodeid, geom=s)
+            nodes_fixed_postions = build_graph(G, features)
 
-                return G, nodes_fixed_postions 
+            return G, nodes_fixed_postions
 
     def write(path, G, schema, crs):
         """
@@ -139,14 +195,17 @@ class io():
 
         : path : Path where to create the .shp file. (e.i. C:\\path\to\output.shp)
 
-        : G : The graph to convert to a .shp file.
+        : G : The graph to convert to a .shp file. Edges are written as linestrings, or if the graph
+            has no edge, nodes are written as points. Each edge or node needs the 'coords' and
+            'properties' attributes, as made by io.read. 'coords' can also be a shapely geometry,
+            it is then written through shapely's mapping().
 
         : schema : The schema for the attributes of the output .shp file. 
             Schema of source .shp file can be copied. 
 
                 Example to copy the a schema.
 
-                    schema = netshapex.getSchema(C:\\path\to\source.shp)
+                    schema = netshapex.getMeta(C:\\path\to\source.shp)['schema']
 
             If no schema where provided. This will use the defualt schema, refer to the code below.
             Schema can also be created. If creating .shp file without any source schema, you should
@@ -162,7 +221,7 @@ class io():
         : crs : Coordinate reference system to use. Defualt is EPSG: 4326. 
             Example to copy the crs of a source.shp file.
 
-                crs = netshapex.getCrs(C:\\path\to\source.shp)
+                crs = netshapex.getMeta(C:\\path\to\source.shp)['crs']
 
         RETURN(S):
 
@@ -174,10 +233,9 @@ class io():
 
         G1, nodes_fixed_postions = netshapex.io.read("/home/source.shp")
 
-        schema = netshapex.getSchema("/home/source.shp")
-        crs = netshapex.getCrs("/home/source.shp")
+        meta = netshapex.getMeta("/home/source.shp")
 
-        netshapex.io.write("/home/output_edges.shp", G1, schema, crs)
+        netshapex.io.write("/home/output_edges.shp", G1, meta['schema'], meta['crs'])
         """
 
         path = path
@@ -189,21 +247,22 @@ class io():
         else:
             crs = crs
 
-        nodes_data = G.nodes(data=True)
-        edges_data = G.edges(data=True)
+        # Getting the geometry type, LineString if there is an edge, else Point.
+        # Only the view that is written is made, and walked once: its first record
+        # is put back in front of the iterator used by the write loop.
+        geom_type = 'LineString'
+        records = iter(G.edges(data=True))
+        first = next(records, None)
 
-        # Getting the geometry type
-        if edges_data:
+        if first is None:
+            geom_type = 'Point'
+            records = iter(G.nodes(data=True))
+            first = next(records, None)
 
-            for n in edges_data:
+        if first is None:
+            raise ValueError("The graph has no nodes or edges to write.")
 
-                geom_type = n[2]['geom']['geometry']['type']
-                
-                break
-        else:
-            for n in nodes_data:
-                geom_type = n[1]['geom']['geometry']['type']
-                break
+        records = itertools.chain([first], records)
 
         # Assigning schema. If schema is not provided, use the default schema below.
         if not schema:
@@ -213,42 +272,22 @@ class io():
         else:
             schema = schema
             
-        # Generate a Point layer if the geometry type is a Point
-        if geom_type == 'Point':           
-
-            # Making a new .shp file as the output.
-            with fiona.open(path, 'w', crs=crs, schema=schema, driver="ESRI Shapefile") as shpfile:
-
-                for n in nodes_data:
-                    
-                    point = Point(n[1]['geom']['geometry']['coordinates'])
-
-                    shpfile.write({
-                                    'geometry': mapping(point),
-                                    'properties': n[1]['geom']['properties']
-                                    })
+        # One writer picked for the layer, see _WRITERS.
+        write_records = _WRITERS[geom_type]
 
-        # Generate a LineString layer if the geometry type is a LineString
-        if geom_type == 'LineString':
+        # Making a new .shp file as the output.
+        with fiona.open(path, 'w', crs=crs, schema=schema, driver="ESRI Shapefile") as shpfile:
 
-            with fiona.open(path, 'w', crs=crs, schema=schema, driver="ESRI Shapefile") as shpfile:
-
-                for e in edges_data:
-                    
-                    line = LineString(e[2]['geom']['geometry']['coordinates'])
-
-                    shpfile.write({
-                                    'geometry': mapping(line),
-                                    'properties': e[2]['geom']['properties']
-                                    })
+            write_records(shpfile, records)
 
 class Reprojector:
     """ Class for reprojecting shp files."""
 
-    def reproject(self, inshpdir, outshpdir, crs):
+    def reproject(self, inshpdir, outshpdir, crs, max_workers=None):
         """ 
         Function that reprojects shp file crs to a given crs. Reprojected .shp files will be on the outshp \
         directory. Reprojected .shp files will have the same name and all attributes from inshpdir.
+        The coordinates of the features are transformed to the given crs, not only the crs of the file.
 
         PARAMETER(S):
 
@@ -258,11 +297,19 @@ class Reprojector:
 
         : crs : Projection to use. See fiona crs documentation.
 
+        : max_workers : Number of processes reprojecting files at the same time. Default is the number
+            of cpu, never more than the number of .shp files. With 1, files are reprojected in this process.
+
+        Files are split between worker processes, so on Windows and macOS call reproject under
+        if __name__ == "__main__": in your script.
+
         EXAMPLE(S):
 
         import netshapex
-        reproj = netshapex.Reprojector()
-        reproj.reproject("home/path/unprojecteddirectory" , "home/path/projecteddirectory", 'EPSG:4326')
+
+        if __name__ == "__main__":
+            reproj = netshapex.Reprojector()
+            reproj.reproject("home/path/unprojecteddirectory" , "home/path/projecteddirectory", 'EPSG:4326')
 
         """
 
@@ -282,47 +329,51 @@ class Reprojector:
                 path_of_shp_files.append(os.path.join(self.inshpdir +"/", filename))
                 logging.info('%s %s', "shp file found: ", filename)
 
-        # Reading the input .shp files.
-        for shpf in path_of_shp_files:
-
-            output_file_name = (os.path.basename(shpf))
+        output_paths = [self.outshpdir + '/' + os.path.basename(shpf) for shpf in path_of_shp_files]
 
-            with fiona.open(shpf) as input_shp:
+        if not max_workers:
+            max_workers = min(len(path_of_shp_files), os.cpu_count() or 1)
 
-                meta = input_shp.meta
-                schema = input_shp.schema
+        logging.info('%s %s', "Writing reprojected files to :", self.outshpdir)
 
-            # Writing the output .shp files
-            logging.info('%s %s', "Writing reprojected files to :", self.outshpdir)
+        # Each file is independent, reproject them in parallel processes.
+        if max_workers > 1:
 
-            with fiona.open(self.outshpdir + '/' + output_file_name, 'w', crs=self.crs, \
-                driver='ESRI Shapefile', schema=schema) as output_shp:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
 
-                with fiona.open(shpf) as input_shp:
+                list(executor.map(_reproject_one, path_of_shp_files, output_paths,
+                                  [self.crs] * len(path_of_shp_files)))
 
-                    meta = input_shp.meta
+        else:
 
-                    for f in input_shp:
+            for in_path, out_path in zip(path_of_shp_files, output_paths):
 
-                        output_shp.write(f)
+                _reproject_one(in_path, out_path, self.crs)
 
-            logging.info('%s', "Reprojecting done.")
+        logging.info('%s', "Reprojecting done.")
 
 
 
 ####################### BEGIN SECTION FOR HELPER FUNCTIONS ##########################
 
-def getSchema(path):
+def getMeta(path):
     """
-    Get the schema of a shapefile as a basis to write an output shapefile.
+    Get the schema and the crs of a shapefile as a basis to write an output shapefile.
+    The shapefile is opened only once.
 
     PARAMETER(S)
 
-    : path : Path to the .shp file where to copy the schema.
+    : path : Path to the .shp file where to copy the schema and the crs.
 
     RETURN(S)
 
-    : schema :  The schema from source .shp
+    : meta :  {'schema': schema, 'crs': crs} from source .shp
+
+    EXAMPLE(S)
+
+    meta = netshapex.getMeta("/home/source.shp")
+
+    netshapex.io.write("/home/output.shp", G, meta['schema'], meta['crs'])
 
     """
 
@@ -330,13 +381,33 @@ def getSchema(path):
 
     with fiona.open(path) as shpfile:
 
-        schema = shpfile.schema.copy()
+        return {'schema': shpfile.schema.copy(), 'crs': shpfile.crs}
 
-        return schema
+def getSchema(path):
+    """
+    Get the schema of a shapefile as a basis to write an output shapefile.
+
+    Deprecated, use getMeta(path)['schema']. getMeta gets the schema and the crs with one open.
+
+    PARAMETER(S)
+
+    : path : Path to the .shp file where to copy the schema.
+
+    RETURN(S)
+
+    : schema :  The schema from source .shp
+
+    """
+
+    warnings.warn("getSchema is deprecated, use getMeta(path)['schema'].", DeprecationWarning, stacklevel=2)
+
+    return getMeta(path)['schema']
 
 def getCrs(path):
     """
     Gets the crs of the given .shp file.
+
+    Deprecated, use getMeta(path)['crs']. getMeta gets the schema and the crs with one open.
     
     PARAMETER(S)
 
@@ -347,13 +418,9 @@ def getCrs(path):
     : crs :  The crs from source .shp
     """
 
-    path = path
-
-    with fiona.open(path) as shpfile:
-
-        crs = shpfile.crs
+    warnings.warn("getCrs is deprecated, use getMeta(path)['crs'].", DeprecationWarning, stacklevel=2)
 
-        return crs
+    return getMeta(path)['crs']
 
 def selectNodeByAttributeValue(graph, attr_field, attr_value):
     """
@@ -361,6 +428,11 @@ def selectNodeByAttributeValue(graph, attr_field, attr_value):
 
     Note: To select a single unique node. You must define a unique attribute value in your layer.
 
+    If numpy is installed, the values of attr_field are kept in an array on graph.graph['_attr_index']
+    the first time the field is queried, next queries on the same field compare against that array.
+    The index is rebuilt when the nodes of the graph change. If you edit the properties of the nodes,
+    clear it with graph.graph.pop('_attr_index', None).
+
     PARAMETER(S)
 
     : graph : A networkx graph object.
@@ -382,11 +454,23 @@ def selectNodeByAttributeValue(graph, attr_field, attr_value):
 
     nodes_data = g.nodes(data=True)
 
+    if np is not None:
+
+        nodes, values = _build_attr_index(g, attr_field)
+
+        # A sequence value (e.i. a tuple) is compared as one value, not broadcast over the array.
+        if not np.isscalar(attr_value):
+            target = np.empty((), dtype=object)
+            target[()] = attr_value
+            attr_value = target
+
+        return [(nodes[i], nodes_data[nodes[i]]) for i in np.flatnonzero(values == attr_value).tolist()]
+
     nodes_by_attr_value = []
 
     for n in nodes_data:
 
-        if n[1]['geom']['properties'][attr_field] == attr_value:
+        if n[1]['properties'][attr_field] == attr_value:
 
             nodes_by_attr_value.append(n)
 
@@ -394,6 +478,357 @@ def selectNodeByAttributeValue(graph, attr_field, attr_value):
 
 ####################### END SECTION FOR HELPER FUNCTIONS ##########################
 
+####################### BEGIN SECTION FOR PRIVATE HELPER FUNCTIONS ##################
+
+# GEOS type id of the geometry types io.read turns into a graph.
+_GEOS_TYPE_IDS = {'Point': 0, 'LineString': 1}
+
+def _read_arrow(path, columns=None):
+    """
+    Reads the whole layer as an Arrow table with pyogrio.
+
+    PARAMETER(S)
+
+    : columns : Names of the fields to read, None for all of them and [] for none.
+
+    RETURN(S)
+
+    : meta, table : The layer metadata and a pyarrow table, geometries are in a WKB column.
+    """
+
+    return read_arrow(path, columns=columns)
+
+def _read_arrow_features(path, read_properties=True):
+    """
+    Reads a layer in columns. Geometries are decoded and their coordinates extracted in one
+    pass each (GEOS loops), not per feature.
+
+    RETURN(S)
+
+    : geom_type : Geometry type of the layer (e.i. 'LineString', 'Point'). If it is not one of these,
+        the other values are None.
+
+    : coordinates : Coordinates of each feature, a tuple for a point, a list of tuples otherwise.
+
+    : endpoints : (N, 2, 2) or (N, 2, 3) float64 array, the first and the last vertex of each feature.
+
+    : properties : Attribute values of each feature as a dict. Date and time values are ISO strings,
+        as fiona gives them.
+    """
+
+    meta, table = _read_arrow(path, columns=None if read_properties else [])
+
+    # Layer type without the Z / M suffix (e.i. 'LineString Z').
+    geom_type = meta['geometry_type'].split(' ')[0]
+
+    if geom_type not in _GEOS_TYPE_IDS:
+        return geom_type, None, None, None
+
+    geometry_name = meta['geometry_name'] or 'wkb_geometry'
+
+    geoms = from_wkb(table[geometry_name].to_numpy(zero_copy_only=False))
+
+    # A shapefile layer is a LineString (Point) layer even if some of its features are multi-part,
+    # those have no single first and last vertex.
+    other = np.flatnonzero(get_type_id(geoms) != _GEOS_TYPE_IDS[geom_type])
+
+    if len(other):
+        i = int(other[0])
+        raise _geometry_type_error(path, i, geoms[i].geom_type if geoms[i] is not None else None, geom_type)
+
+    properties = _iso_dates(table.drop_columns([geometry_name])).to_pylist()
+
+    # All the vertices of the layer in a single (N, 2) or (N, 3) array and the
+    # index of the feature each vertex belongs to.
+    coords, index = get_coordinates(geoms, include_z=bool(has_z(geoms).any()), return_index=True)
+
+    counts = np.bincount(index, minlength=len(geoms))
+    ends = np.cumsum(counts) - 1
+    starts = ends - counts + 1
+
+    vertices = list(map(tuple, coords.tolist()))
+
+    if geom_type == "Point":
+        coordinates = [vertices[i] for i in starts.tolist()]
+    else:
+        coordinates = [vertices[i:j + 1] for i, j in zip(starts.tolist(), ends.tolist())]
+
+    endpoints = np.stack([coords[starts], coords[ends]], axis=1)
+
+    return geom_type, coordinates, endpoints, properties
+
+def _iso_dates(table):
+    """
+    Turns the date, time and datetime columns of an Arrow table into the ISO strings fiona gives
+    (e.i. '2020-01-02', '03:04:05', '2020-01-02T03:04:05'), so both read paths give the same values.
+    """
+
+    for i, field in enumerate(table.schema):
+
+        if pyarrow.types.is_date(field.type):
+            column = pyarrow.compute.strftime(table.column(i), format='%Y-%m-%d')
+        elif pyarrow.types.is_timestamp(field.type):
+            column = table.column(i).cast(pyarrow.timestamp('s', tz=field.type.tz), safe=False)
+            column = pyarrow.compute.strftime(column, format='%Y-%m-%dT%H:%M:%S')
+        elif pyarrow.types.is_time(field.type):
+            column = table.column(i).cast(pyarrow.time32('s'), safe=False).cast(pyarrow.string())
+        else:
+            continue
+
+        table = table.set_column(i, field.name, column)
+
+    return table
+
+def _fiona_features(path, shpfile, geom_type):
+    """
+    Yields the (coordinates, properties) of each feature read by fiona. Like the Arrow path, a
+    feature that is not of the layer type (e.i. a multi-part line) raises a ValueError.
+    """
+
+    for s in shpfile:
+
+        geometry = s['geometry']
+
+        if geometry is None or geometry['type'] != geom_type:
+            raise _geometry_type_error(path, s['id'], geometry['type'] if geometry else None, geom_type)
+
+        yield geometry['coordinates'], dict(s['properties'])
+
+def _geometry_type_error(path, fid, found, geom_type):
+    """ Error for a feature io.read cannot turn into an edge or a node (e.i. a multi-part line)."""
+
+    return ValueError("Feature %s of %s is a %s geometry, io.read only reads single part %s features."
+                      % (fid, path, found, geom_type))
+
+def _reproject_one(in_path, out_path, crs):
+    """
+    Reprojects a single .shp file to out_path. Used by Reprojector.reproject, it is a module
+    level function so it can be sent to worker processes.
+
+    The coordinates are transformed by GDAL/OGR (PROJ) from the crs of the input to crs.
+    A file without crs (no .prj) cannot be transformed, it is logged and skipped.
+    """
+
+    with fiona.open(in_path) as input_shp:
+
+        src_crs = input_shp.crs
+
+        if not src_crs:
+            logging.warning('%s %s', "No crs (.prj) found, file not reprojected: ", in_path)
+            return
+
+        with fiona.open(out_path, 'w', crs=crs, driver='ESRI Shapefile', \
+            schema=input_shp.schema) as output_shp:
+
+            output_shp.writerecords(_transform_records(input_shp, src_crs, crs))
+
+    logging.info('%s %s', "Reprojected: ", os.path.basename(in_path))
+
+def _transform_records(features, src_crs, dst_crs, chunk_size=10000):
+    """
+    Yields the features with their geometry transformed from src_crs to dst_crs. The geometries
+    are transformed by chunk, one transform_geom call (one OGR transformation) for each chunk.
+    Null geometries stay null.
+    """
+
+    features = iter(features)
+
+    for chunk in iter(lambda: list(itertools.islice(features, chunk_size)), []):
+
+        geoms = [f['geometry'] for f in chunk]
+
+        not_null = [g for g in geoms if g]
+
+        if not not_null:
+            transformed = iter(())
+        elif _FIONA_1_9:
+            transformed = iter(transform_geom(src_crs, dst_crs, not_null))
+        else:
+            transformed = (transform_geom(src_crs, dst_crs, g) for g in not_null)
+
+        for f, g in zip(chunk, geoms):
+
+            yield {
+                    'geometry': next(transformed) if g else None,
+                    'properties': f['properties']
+                    }
+
+def _build_attr_index(graph, attr_field):
+    """
+    Gets, or builds in one pass over the nodes, the (nodes, values) index of an attribute field.
+    Values of a single scalar type are stored in a typed numpy array, other values (mixed types,
+    tuples, None, ...) in an object array so each value keeps its own python equality.
+
+    The index is cached on graph.graph['_attr_index'][attr_field], it is rebuilt if the nodes of
+    the graph are not the cached ones anymore.
+    """
+
+    cache = graph.graph.setdefault('_attr_index', {})
+
+    index = cache.get(attr_field)
+
+    nodes = list(graph.nodes())
+
+    if index is None or index[0] != nodes:
+
+        values = [d['properties'][attr_field] for _, d in graph.nodes(data=True)]
+
+        value_types = set(map(type, values))
+
+        if len(value_types) == 1 and value_types <= {int, float, str, bool}:
+            values = np.array(values)
+        else:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            values = array
+
+        index = cache[attr_field] = (nodes, values)
+
+    return index
+
+def _add_lines(G, features):
+    """
+    Adds an edge between the first and the last vertex of each LineString feature.
+    features are (coordinates, properties) pairs.
+
+    RETURN(S)
+
+    : nodes_fixed_postions : Position of each node, keyed by node id.
+    """
+
+    coord_to_id = {}
+
+    edges = []
+
+    for coords, properties in features:
+
+        # fiona gives the vertices as tuples, tuple() returns them as is.
+        c0, c1 = tuple(coords[0]), tuple(coords[-1])
+
+        id_for_edge_1 = coord_to_id.setdefault(c0, len(coord_to_id))
+
+        id_for_edge_2 = coord_to_id.setdefault(c1, len(coord_to_id))
+
+        edges.append((id_for_edge_1, id_for_edge_2,
+                      {'coords': coords, 'properties': properties}))
+
+    G.add_edges_from(edges)
+
+    return dict(enumerate(coord_to_id))
+
+def _add_points(G, features):
+    """
+    Adds a node for each Point feature. features are (coordinates, properties) pairs.
+
+    RETURN(S)
+
+    : nodes_fixed_postions : Position of each node, keyed by node id.
+    """
+
+    coord_to_id = {}
+
+    nodes = []
+
+    for coords, properties in features:
+
+        nodeid = coord_to_id.setdefault(tuple(coords), len(coord_to_id))
+
+        nodes.append((nodeid, {'coords': coords, 'properties': properties}))
+
+    G.add_nodes_from(nodes)
+
+    return dict(enumerate(coord_to_id))
+
+def _write_points(shpfile, records):
+    """ Writes (node, data) records to a Point layer."""
+
+    # Coordinates are written as they are, only a shapely geometry goes through mapping().
+    shpfile.writerecords({
+                        'geometry': mapping(d['coords']) if hasattr(d['coords'], '__geo_interface__')
+                                    else {'type': 'Point', 'coordinates': d['coords']},
+                        'properties': d['properties']
+                        } for _, d in records)
+
+def _write_lines(shpfile, records):
+    """ Writes (u, v, data) records to a LineString layer."""
+
+    shpfile.writerecords({
+                        'geometry': mapping(d['coords']) if hasattr(d['coords'], '__geo_interface__')
+                                    else {'type': 'LineString', 'coordinates': d['coords']},
+                        'properties': d['properties']
+                        } for _, _, d in records)
+
+def _add_lines_compiled(G, endpoints, coordinates, properties):
+    """
+    Same as _add_lines, with the node ids assigned by the numba kernel _assign_ids from the
+    (N, 2, 2) endpoints array.
+
+    RETURN(S)
+
+    : nodes_fixed_postions : Position of each node, keyed by node id.
+    """
+
+    ids_1 = np.empty(len(endpoints), dtype=np.int64)
+    ids_2 = np.empty(len(endpoints), dtype=np.int64)
+
+    positions = _assign_ids(endpoints, ids_1, ids_2)
+
+    G.add_edges_from(zip(ids_1.tolist(), ids_2.tolist(),
+                         ({'coords': c, 'properties': p} for c, p in zip(coordinates, properties))))
+
+    return dict(enumerate(map(tuple, positions.tolist())))
+
+if njit is not None:
+
+    _POINT = types.UniTuple(types.float64, 2)
+
+    @njit(cache=True)
+    def _assign_ids(endpoints, out_e1, out_e2):
+        """
+        Gives an id to each distinct endpoint in the order they are met, like coord_to_id in
+        _add_lines. The ids of the two ends of line i go to out_e1[i] and out_e2[i].
+
+        RETURN(S)
+
+        : positions : (number of nodes, 2) array, the coordinates of each node id.
+        """
+
+        coord_to_id = Dict.empty(key_type=_POINT, value_type=types.int64)
+
+        positions = np.empty((2 * endpoints.shape[0], 2), dtype=np.float64)
+
+        for i in range(endpoints.shape[0]):
+
+            for j in range(2):
+
+                # + 0.0 turns -0.0 into 0.0, they are the same key in python but not here.
+                key = (endpoints[i, j, 0] + 0.0, endpoints[i, j, 1] + 0.0)
+
+                nodeid = coord_to_id.get(key, -1)
+
+                if nodeid == -1:
+                    nodeid = len(coord_to_id)
+                    coord_to_id[key] = nodeid
+                    positions[nodeid, 0] = key[0]
+                    positions[nodeid, 1] = key[1]
+
+                if j == 0:
+                    out_e1[i] = nodeid
+                else:
+                    out_e2[i] = nodeid
+
+        return positions[:len(coord_to_id)]
+
+else:
+    _assign_ids = None
+
+# Geometry type of the layer to the function handling it in io.read and io.write.
+_GRAPH_BUILDERS = {'LineString': _add_lines, 'Point': _add_points}
+
+_WRITERS = {'Point': _write_points, 'LineString': _write_lines}
+
+####################### END SECTION FOR PRIVATE HELPER FUNCTIONS ####################
+
 
 
 